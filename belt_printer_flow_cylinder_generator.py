@@ -3,8 +3,38 @@ from tkinter import simpledialog, messagebox, ttk
 import os
 import re
 import math
+import array
 import datetime
 
+_RE_S = re.compile(r'S(-?[0-9]*\.?[0-9]+)')
+_RE_GMOVE = re.compile(r'^(G[01]) ([^;\n]*)', re.M)
+_RE_HEIGHT_BELT = re.compile(r';HEIGHT-BELT:\s*([0-9]+\.?[0-9]*)')
+_RE_MM = re.compile(r'([0-9]+\.?[0-9]*)\s*mm')
+_RE_NUMBER = re.compile(r'([0-9]+\.?[0-9]*)')
+
+_WRITE_CHUNK = 1 << 20
+_PRINT_END_TAIL = 8192
+
+def _word_value(word):
+    # Numeric value of a G-code word such as "X12.5", or None if missing or malformed
+    if word is None:
+        return None
+    try:
+        return float(word[1:])
+    except ValueError:
+        return None
+
+def _circle_points(center_x, center_y, radius, segments):
+    # The perimeter and every spiral turn visit the same points, so compute them once
+    step = 2 * math.pi / segments
+    return [(center_x + radius * math.cos(k * step), center_y + radius * math.sin(k * step))
+            for k in range(segments)]
+
+def _spiral_moves(points, extrusion):
+    # X/Y repeat on every turn of the spiral, so format them once per point and
+    # leave only Z to be filled in on each step
+    return ["G1 X%.3f Y%.3f Z%%.4f E%.4f F800\n" % (x, y, extrusion) for x, y in points]
+
 class GCodeGenerator:
     def __init__(self, base_gcode, layer_height, section_height, initial_flow_rate, bed_temp, nozzle_temp, 
                  flow_increase, num_sections, nozzle_diameter, cylinder_diameter, adhesion_offset):
@@ -18,13 +48,7 @@ class GCodeGenerator:
         self.num_sections = num_sections
         self.nozzle_diameter = nozzle_diameter
         self.adhesion_offset = adhesion_offset
-        self.layer_heights = self.find_layer_heights()
-        if len(self.layer_heights) >= 2:
-            self.last_z = self.layer_heights[-1]
-            self.second_last_z = self.layer_heights[-2]
-        else:
-            self.last_z = self.layer_heights[-1] if self.layer_heights else 0
-            self.second_last_z = 0
+        self._scan_base()
         self.min_x, self.max_x, self.min_y, self.max_y = self.find_overall_bounding_box()
         self.center_x = (self.min_x + self.max_x) / 2
         self.center_y = (self.min_y + self.max_y) / 2
@@ -36,87 +60,127 @@ class GCodeGenerator:
         self.cylinder_radius = self.cylinder_diameter / 2
         self.start_z = self.second_last_z + self.adhesion_offset
         self.print_end_sequence = self.extract_print_end_sequence()
-    def find_layer_heights(self):
-        z_heights = set()
-        for line in self.base_gcode.splitlines():
-            if line.startswith("G0 ") or line.startswith("G1 "):
-                z_match = re.search(r'Z([0-9]+\.?[0-9]*)', line)
-                if z_match:
-                    z_heights.add(float(z_match.group(1)))
-        return sorted(list(z_heights))
+    def _scan_base(self):
+        # Single pass over the base G-code collecting everything the generator needs.
+        # Axis words are kept as text and only converted to float where the value is used.
+        # Only the two highest distinct Z heights are needed
+        z_max, z_second = -math.inf, -math.inf
+        x_positions = array.array('d')
+        y_positions = array.array('d')
+        last_x, last_y, last_z, last_e = None, None, None, None
+        for match in _RE_GMOVE.finditer(self.base_gcode):
+            x, y, z, e = None, None, None, None
+            for tok in match.group(2).split():
+                axis = tok[0]
+                if axis == "X":
+                    x = tok
+                elif axis == "Y":
+                    y = tok
+                elif axis == "Z":
+                    z = tok
+                elif axis == "E":
+                    e = tok
+            if x is not None: last_x = x
+            if y is not None: last_y = y
+            if z is not None:
+                z_value = _word_value(z) if z != last_z else None
+                if z_value is not None:
+                    if z_value > z_max:
+                        z_second, z_max = z_max, z_value
+                    elif z_max > z_value > z_second:
+                        z_second = z_value
+                last_z = z
+            if e is not None:
+                last_e = e
+                if match.group(1) == "G1" and x is not None and y is not None:
+                    try:
+                        x_value = float(x[1:])
+                        y_value = float(y[1:])
+                    except ValueError:
+                        continue
+                    x_positions.append(x_value)
+                    y_positions.append(y_value)
+        self.last_z = z_max if z_max > -math.inf else 0
+        self.second_last_z = z_second if z_second > -math.inf else 0
+        if x_positions and y_positions:
+            self._bounding_box = (min(x_positions), max(x_positions), min(y_positions), max(y_positions))
+        else:
+            self._bounding_box = (0, 100, 0, 100)
+        self._last_position = tuple(_word_value(word) for word in (last_x, last_y, last_z, last_e))
+
+    def _find_print_end_line(self, start):
+        # Start of the last line at or after start that calls PRINT_END outside a comment, or -1
+        base = self.base_gcode
+        idx = base.rfind("PRINT_END", start)
+        while idx >= 0:
+            line_start = base.rfind("\n", 0, idx) + 1
+            if ";" not in base[line_start:idx]:
+                return line_start
+            idx = base.rfind("PRINT_END", start, idx)
+        return -1
 
     def extract_print_end_sequence(self):
-        print_end_sequence = ""
-        print_end_found = False
-        print_end_lines = []
-        for line in self.base_gcode.splitlines():
-            if "PRINT_END" in line or (print_end_found and not line.strip()):
-                print_end_found = True
-                print_end_lines.append(line)
-        if print_end_lines:
-            print_end_sequence = "\n".join(print_end_lines)
-        return print_end_sequence
+        # PRINT_END normally sits at the end of the file, so search the tail first and
+        # only fall back to the whole file when it is not there.
+        # Everything from its line to the end of the file is the end sequence.
+        tail_start = max(0, len(self.base_gcode) - _PRINT_END_TAIL)
+        line_start = self._find_print_end_line(tail_start)
+        if line_start < 0 and tail_start > 0:
+            line_start = self._find_print_end_line(0)
+        if line_start < 0:
+            return ""
+        return self.base_gcode[line_start:].rstrip()
     
-    def remove_print_end_sequence(self):
-        if not self.print_end_sequence:
-            return self.base_gcode
-        base_without_end = self.base_gcode
-        if self.print_end_sequence in base_without_end:
-            base_without_end = base_without_end.replace(self.print_end_sequence, "")
-        return base_without_end
+    def _base_spans(self):
+        # Index ranges of the base G-code to keep: everything but the PRINT_END sequence,
+        # with trailing whitespace trimmed
+        base = self.base_gcode
+        spans = [(0, len(base))]
+        idx = base.rfind(self.print_end_sequence) if self.print_end_sequence else -1
+        if idx >= 0:
+            spans = [(0, idx), (idx + len(self.print_end_sequence), len(base))]
+        while spans:
+            start, end = spans[-1]
+            while end > start and base[end - 1].isspace():
+                end -= 1
+            if end > start:
+                spans[-1] = (start, end)
+                break
+            spans.pop()
+        return spans
 
     def find_overall_bounding_box(self):
-        x_positions = []
-        y_positions = []
-        for line in self.base_gcode.splitlines():
-            if line.startswith("G1 ") and "E" in line:
-                x_match = re.search(r'X([0-9]+\.?[0-9]*)', line)
-                y_match = re.search(r'Y([0-9]+\.?[0-9]*)', line)
-                if x_match and y_match:
-                    x_positions.append(float(x_match.group(1)))
-                    y_positions.append(float(y_match.group(1)))
-        if x_positions and y_positions:
-            min_x = min(x_positions)
-            max_x = max(x_positions)
-            min_y = min(y_positions)
-            max_y = max(y_positions)
-            return min_x, max_x, min_y, max_y
-        else:
-            return 0, 100, 0, 100
+        return self._bounding_box
+
     def get_last_position(self):
-        x, y, z, e = None, None, None, None
-        for line in self.base_gcode.splitlines():
-            if line.startswith("G0 ") or line.startswith("G1 "):
-                x_match = re.search(r'X([0-9]+\.?[0-9]*)', line)
-                y_match = re.search(r'Y([0-9]+\.?[0-9]*)', line)
-                z_match = re.search(r'Z([0-9]+\.?[0-9]*)', line)
-                e_match = re.search(r'E([0-9]+\.?[0-9]*)', line)
-                if x_match: x = float(x_match.group(1))
-                if y_match: y = float(y_match.group(1))
-                if z_match: z = float(z_match.group(1))
-                if e_match: e = float(e_match.group(1))
-        return x, y, z, e
+        return self._last_position
 
-    def generate_gcode(self):
-        base_gcode_cleaned = self.remove_print_end_sequence().rstrip()
-        continuation_gcode = "\n\n; CYLINDER CONTINUATION - SPIRAL VASE MODE\n"
-        continuation_gcode += f"; Generated on: 2025-03-05 20:49:38\n"
-        continuation_gcode += f"; Generated by: xboxhacker\n"
-        continuation_gcode += f"; Starting Z: {self.start_z:.3f} mm (with {self.adhesion_offset:.3f}mm adhesion offset)\n"
-        continuation_gcode += f"; Layer height: {self.layer_height} mm\n"
-        continuation_gcode += f"; Section height: {self.section_height} mm\n"
-        continuation_gcode += f"; Initial flow rate: {self.initial_flow_rate}%\n"
-        continuation_gcode += f"; Bed temperature: {self.bed_temp}\n"
-        continuation_gcode += f"; Nozzle temperature: {self.nozzle_temp}\n"
-        continuation_gcode += f"; Flow increase per section: {self.flow_increase}%\n"
-        continuation_gcode += f"; Number of sections: {self.num_sections}\n"
-        continuation_gcode += f"; Nozzle diameter: {self.nozzle_diameter} mm\n"
-        continuation_gcode += f"; Cylinder diameter: {self.cylinder_diameter} mm (max allowed: {self.max_diameter:.2f}mm)\n"
-        continuation_gcode += f"; Print bounding box: X=[{self.min_x:.2f}, {self.max_x:.2f}], Y=[{self.min_y:.2f}, {self.max_y:.2f}]\n"
-        continuation_gcode += f"; Cylinder center: X={self.center_x:.2f}, Y={self.center_y:.2f}\n\n"
-        continuation_gcode += "G90 ; Absolute positioning\n"
-        continuation_gcode += "M83 ; Relative extruder mode\n"
-        continuation_gcode += f"M221 S{self.initial_flow_rate} ; Set initial flow rate to {self.initial_flow_rate}%\n"
+    def generate_gcode(self, out_fh):
+        if self.layer_height <= 0 or self.section_height <= 0:
+            raise ValueError("Layer height and section height must be greater than zero")
+        write = out_fh.write
+        # Copy the base G-code in chunks rather than building a cleaned copy of it
+        for start, end in self._base_spans():
+            for pos in range(start, end, _WRITE_CHUNK):
+                write(self.base_gcode[pos:min(pos + _WRITE_CHUNK, end)])
+        write("\n\n; CYLINDER CONTINUATION - SPIRAL VASE MODE\n")
+        write(f"; Generated on: 2025-03-05 20:49:38\n")
+        write(f"; Generated by: xboxhacker\n")
+        write(f"; Starting Z: {self.start_z:.3f} mm (with {self.adhesion_offset:.3f}mm adhesion offset)\n")
+        write(f"; Layer height: {self.layer_height} mm\n")
+        write(f"; Section height: {self.section_height} mm\n")
+        write(f"; Initial flow rate: {self.initial_flow_rate}%\n")
+        write(f"; Bed temperature: {self.bed_temp}\n")
+        write(f"; Nozzle temperature: {self.nozzle_temp}\n")
+        write(f"; Flow increase per section: {self.flow_increase}%\n")
+        write(f"; Number of sections: {self.num_sections}\n")
+        write(f"; Nozzle diameter: {self.nozzle_diameter} mm\n")
+        write(f"; Cylinder diameter: {self.cylinder_diameter} mm (max allowed: {self.max_diameter:.2f}mm)\n")
+        write(f"; Print bounding box: X=[{self.min_x:.2f}, {self.max_x:.2f}], Y=[{self.min_y:.2f}, {self.max_y:.2f}]\n")
+        write(f"; Cylinder center: X={self.center_x:.2f}, Y={self.center_y:.2f}\n\n")
+        write("G90 ; Absolute positioning\n")
+        write("M83 ; Relative extruder mode\n")
+        write(f"M221 S{self.initial_flow_rate} ; Set initial flow rate to {self.initial_flow_rate}%\n")
         extrusion_width = self.nozzle_diameter * 1.2
         extrusion_height = self.layer_height
         extrusion_area = extrusion_width * extrusion_height
@@ -125,60 +189,48 @@ class GCodeGenerator:
         radius = self.cylinder_radius
         first_x = self.center_x + radius
         first_y = self.center_y
-        continuation_gcode += f"; Moving to start position for cylinder perimeter\n"
-        continuation_gcode += f"G0 F3000 X{first_x:.3f} Y{first_y:.3f} ; Move to first point\n"
-        continuation_gcode += f"G1 F1200 Z{self.start_z:.3f} ; Move to start height with adhesion offset\n"
-        continuation_gcode += f"G1 F300 E5.0 ; Prime extruder for good adhesion\n"
-        continuation_gcode += f"; Printing first perimeter at Z={self.start_z:.3f} (with {self.adhesion_offset:.3f}mm adhesion offset)\n"
+        write(f"; Moving to start position for cylinder perimeter\n")
+        write(f"G0 F3000 X{first_x:.3f} Y{first_y:.3f} ; Move to first point\n")
+        write(f"G1 F1200 Z{self.start_z:.3f} ; Move to start height with adhesion offset\n")
+        write(f"G1 F300 E5.0 ; Prime extruder for good adhesion\n")
+        write(f"; Printing first perimeter at Z={self.start_z:.3f} (with {self.adhesion_offset:.3f}mm adhesion offset)\n")
         segments = 72
+        points = _circle_points(self.center_x, self.center_y, radius, segments)
+        # Every segment spans the same chord, so the extrusion per move is constant
+        chord = 2 * radius * math.sin(math.pi / segments)
+        perimeter_move = "G1 F600 X%%.3f Y%%.3f E%.4f\n" % (chord * extrusion_ratio * 1.3)
         for i in range(1, segments + 1):
-            angle = (i * 2 * math.pi / segments)
-            x = self.center_x + radius * math.cos(angle)
-            y = self.center_y + radius * math.sin(angle)
-            prev_x = self.center_x + radius * math.cos((i-1) * 2 * math.pi / segments)
-            prev_y = self.center_y + radius * math.sin((i-1) * 2 * math.pi / segments)
-            segment_length = math.sqrt((x - prev_x)**2 + (y - prev_y)**2)
-            extrusion = segment_length * extrusion_ratio * 1.3
-            continuation_gcode += f"G1 F600 X{x:.3f} Y{y:.3f} E{extrusion:.4f}\n"
-        continuation_gcode += f"\n; Beginning spiral climb from Z={self.start_z:.3f}\n"
-        current_z = self.start_z
-        target_z = self.start_z + (self.num_sections * self.section_height)
-        current_section = 0
-        current_flow_rate = self.initial_flow_rate
+            write(perimeter_move % points[i % segments])
+        write(f"\n; Beginning spiral climb from Z={self.start_z:.3f}\n")
         z_per_segment = self.layer_height / segments
-        steps = int(((target_z - self.start_z) / z_per_segment) + 1)
+        # Step at which each section starts; the climb ends on the step that starts the last one
+        section_starts = [math.ceil(k * self.section_height / z_per_segment - 1e-9) - 1
+                          for k in range(1, self.num_sections + 1)]
+        steps = section_starts[-1] + 1 if section_starts else 1
+        section_starts.append(steps)
+        next_section = 0
+        spiral_moves = _spiral_moves(points, math.hypot(chord, z_per_segment) * extrusion_ratio)
         for i in range(steps):
-            angle = ((i % segments) * 2 * math.pi / segments)
-            x = self.center_x + radius * math.cos(angle)
-            y = self.center_y + radius * math.sin(angle)
-            current_z += z_per_segment
-            section = int((current_z - self.start_z) / self.section_height)
-            if section > current_section:
-                current_section = section
-                current_flow_rate = self.initial_flow_rate + (section * self.flow_increase)
-                continuation_gcode += f"; Starting section {section+1} with flow rate {current_flow_rate:.1f}%\n"
-                continuation_gcode += f"M221 S{current_flow_rate:.1f} ; Set flow rate to {current_flow_rate:.1f}%\n"
-            prev_angle = ((i-1) % segments * 2 * math.pi / segments)
-            prev_x = self.center_x + radius * math.cos(prev_angle)
-            prev_y = self.center_y + radius * math.sin(prev_angle)
-            segment_length = math.sqrt((x - prev_x)**2 + (y - prev_y)**2 + z_per_segment**2)
-            extrusion = segment_length * extrusion_ratio
-            continuation_gcode += f"G1 X{x:.3f} Y{y:.3f} Z{current_z:.4f} E{extrusion:.4f} F800\n"
+            current_z = self.start_z + (i + 1) * z_per_segment
+            if i >= section_starts[next_section]:
+                # Several sections can start on the same step when they are thinner than one step
+                while i >= section_starts[next_section]:
+                    next_section += 1
+                current_flow_rate = self.initial_flow_rate + (next_section * self.flow_increase)
+                write(f"; Starting section {next_section+1} with flow rate {current_flow_rate:.1f}%\n")
+                write(f"M221 S{current_flow_rate:.1f} ; Set flow rate to {current_flow_rate:.1f}%\n")
+            write(spiral_moves[i % segments] % current_z)
             if (i % segments) == 0 and i > 0:
                 layer_num = int((current_z - self.start_z) / self.layer_height)
-                continuation_gcode += f"; Layer {layer_num}, Z={current_z:.2f}\n"
-            if current_z >= target_z:
-                break
-        continuation_gcode += "\n; End spiral vase cylinder\n"
+                write(f"; Layer {layer_num}, Z={current_z:.2f}\n")
+        write("\n; End spiral vase cylinder\n")
         if self.print_end_sequence:
-            continuation_gcode += "\n" + self.print_end_sequence + "\n"
+            write("\n" + self.print_end_sequence + "\n")
         else:
-            continuation_gcode += "M104 S0 ; Turn off extruder\n"
-            continuation_gcode += "M140 S0 ; Turn off bed\n"
-            continuation_gcode += "M107 ; Turn off fan\n"
-            continuation_gcode += "M84 ; Disable motors\n"
-        full_gcode = base_gcode_cleaned + continuation_gcode
-        return full_gcode
+            write("M104 S0 ; Turn off extruder\n")
+            write("M140 S0 ; Turn off bed\n")
+            write("M107 ; Turn off fan\n")
+            write("M84 ; Disable motors\n")
 
 def extract_settings_from_gcode(base_gcode):
     settings = {
@@ -192,69 +244,78 @@ def extract_settings_from_gcode(base_gcode):
         "cylinder_diameter": 20.0
     }
     
-    for line in base_gcode.splitlines():
-        if ";HEIGHT-BELT:" in line:
-            match = re.search(r';HEIGHT-BELT:\s*([0-9]+\.?[0-9]*)', line)
-            if match:
-                settings["layer_height"] = float(match.group(1))
-        
-        if "nozzle" in line.lower() and "diameter" in line.lower():
-            match = re.search(r'([0-9]+\.?[0-9]*)\s*mm', line)
-            if match:
-                settings["nozzle_diameter"] = float(match.group(1))
-                
-        if "bed" in line.lower() and "temp" in line.lower():
-            match = re.search(r'([0-9]+\.?[0-9]*)', line)
-            if match:
-                settings["bed_temp"] = int(float(match.group(1)))
-                
-        if "nozzle" in line.lower() and "temp" in line.lower() or "hotend" in line.lower():
-            match = re.search(r'([0-9]+\.?[0-9]*)', line)
-            if match:
-                settings["nozzle_temp"] = int(float(match.group(1)))
-                
-        if line.startswith("M221 "):
-            match = re.search(r'S([0-9]+\.?[0-9]*)', line)
-            if match:
-                settings["initial_flow_rate"] = int(float(match.group(1)))
+    # Values set by M-codes take priority over ones guessed from comments
+    comment_settings = {}
+    mcode_settings = {}
     for line in base_gcode.splitlines():
         if line.startswith("M140"):
-            match = re.search(r'S([0-9]+\.?[0-9]*)', line)
+            match = _RE_S.search(line)
             if match:
-                settings["bed_temp"] = int(float(match.group(1)))
-        
-        if line.startswith("M104") or line.startswith("M109"):
-            match = re.search(r'S([0-9]+\.?[0-9]*)', line)
+                mcode_settings["bed_temp"] = int(float(match.group(1)))
+        elif line.startswith(("M104", "M109")):
+            match = _RE_S.search(line)
             if match:
-                settings["nozzle_temp"] = int(float(match.group(1)))
-                
-        if line.startswith("M221"):
-            match = re.search(r'S([0-9]+\.?[0-9]*)', line)
+                mcode_settings["nozzle_temp"] = int(float(match.group(1)))
+        elif line.startswith("M221"):
+            match = _RE_S.search(line)
             if match:
-                settings["initial_flow_rate"] = int(float(match.group(1)))
-    
+                mcode_settings["initial_flow_rate"] = int(float(match.group(1)))
+        elif line.startswith(";"):
+            if ";HEIGHT-BELT:" in line:
+                match = _RE_HEIGHT_BELT.search(line)
+                if match:
+                    comment_settings["layer_height"] = float(match.group(1))
+                continue
+            lower = line.lower()
+            if "nozzle" in lower and "diameter" in lower:
+                match = _RE_MM.search(line)
+                if match:
+                    comment_settings["nozzle_diameter"] = float(match.group(1))
+            if "bed" in lower and "temp" in lower:
+                match = _RE_NUMBER.search(line)
+                if match:
+                    comment_settings["bed_temp"] = int(float(match.group(1)))
+            if "nozzle" in lower and "temp" in lower or "hotend" in lower:
+                match = _RE_NUMBER.search(line)
+                if match:
+                    comment_settings["nozzle_temp"] = int(float(match.group(1)))
+    settings.update(comment_settings)
+    settings.update(mcode_settings)
     return settings
 
 def get_layer_heights(base_gcode):
     z_heights = set()
     for line in base_gcode.splitlines():
-        if line.startswith("G0 ") or line.startswith("G1 "):
-            z_match = re.search(r'Z([0-9]+\.?[0-9]*)', line)
-            if z_match:
-                z = float(z_match.group(1))
-                z_heights.add(z)
+        if line.startswith(("G0 ", "G1 ")):
+            for tok in line.split():
+                if tok[0] == ";":
+                    break
+                if tok[0] == "Z":
+                    z = _word_value(tok)
+                    if z is not None:
+                        z_heights.add(z)
+                    break
     return sorted(list(z_heights))
 
 def get_max_cylinder_diameter(base_gcode):
-    x_positions = []
-    y_positions = []
+    x_positions = array.array('d')
+    y_positions = array.array('d')
     for line in base_gcode.splitlines():
-        if line.startswith("G1 ") and "E" in line:
-            x_match = re.search(r'X([0-9]+\.?[0-9]*)', line)
-            y_match = re.search(r'Y([0-9]+\.?[0-9]*)', line)
-            if x_match and y_match:
-                x_positions.append(float(x_match.group(1)))
-                y_positions.append(float(y_match.group(1)))
+        if line.startswith("G1 "):
+            x, y, has_e = None, None, False
+            for tok in line.split():
+                axis = tok[0]
+                if axis == ";":
+                    break
+                if axis == "X":
+                    x = _word_value(tok)
+                elif axis == "Y":
+                    y = _word_value(tok)
+                elif axis == "E":
+                    has_e = True
+            if has_e and x is not None and y is not None:
+                x_positions.append(x)
+                y_positions.append(y)
     if x_positions and y_positions:
         min_x = min(x_positions)
         max_x = max(x_positions)
@@ -280,10 +341,17 @@ def create_gcode_file(base_gcode, layer_height, section_height, initial_flow_rat
         generator = GCodeGenerator(base_gcode, layer_height, section_height, initial_flow_rate, bed_temp, 
                                   nozzle_temp, flow_increase, num_sections, nozzle_diameter, cylinder_diameter,
                                   adhesion_offset)
-        gcode = generator.generate_gcode()
         output_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output.gcode")
-        with open(output_path, "w") as file:
-            file.write(gcode)
+        # Generate into a temporary file so a failure never leaves a partial output.gcode behind
+        temp_path = output_path + ".tmp"
+        try:
+            with open(temp_path, "w") as file:
+                generator.generate_gcode(file)
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
         print(f"G-code file generated successfully at: {output_path}")
         print(f"File size: {os.path.getsize(output_path)/1024:.1f} KB")
         messagebox.showinfo("Success", f"G-code file generated successfully!\nLocation: {output_path}")